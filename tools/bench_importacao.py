@@ -0,0 +1,88 @@
+# tools/bench_importacao.py
+#
+# Mede a vazão da importação de CSV de campanhas (importar_csv_campanha) em um banco SQLite temporário.
+#
+#   python tools/bench_importacao.py --linhas 10000 100000 --chunk 1000
+#   python tools/bench_importacao.py --linhas 10000 --comparar-orm
+#
+# Para cada tamanho gera um CSV sintético em disco, importa em uma campanha nova e reporta linhas/s.
+# Com --comparar-orm, roda também o caminho antigo (um Documento ORM por linha e um único commit).
+
+import argparse
+import csv
+import logging
+import os
+import sys
+import tempfile
+import time
+import uuid
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+
+def gerar_csv(caminho, linhas):
+    with open(caminho, 'w', newline='', encoding='utf-8') as f:
+        w = csv.writer(f, delimiter=';')
+        w.writerow(['nome', 'cpf', 'telefone', 'cidade'])
+        for i in range(linhas):
+            w.writerow([f'Participante {i}', f'{i:011d}', f'55119{i % 10**8:08d}', 'São Paulo'])
+
+
+def importar_orm(assignit, stream, campanha_id):
+    """Caminho anterior: um objeto por linha no unit-of-work e um commit no final."""
+    count = 0
+    for row in assignit.ler_csv_stream(stream):
+        participante = assignit.extrair_participante(row)
+        if not participante:
+            continue
+        cpf, tel, nome = participante
+        req_id = str(uuid.uuid4())
+        assignit.db.session.add(assignit.Documento(
+            request_id=req_id, signer_name=nome, signer_cpf=cpf, signer_phone=tel,
+            doc_data=row, original_filename=f"campanha_{campanha_id}_{req_id}.pdf",
+            campanha_id=campanha_id, status='generating', whatsapp_status='Pausado'))
+        count += 1
+    assignit.db.session.commit()
+    return count
+
+
+def main():
+    parser = argparse.ArgumentParser(description='Benchmark da importação de CSV de campanhas.')
+    parser.add_argument('--linhas', type=int, nargs='+', default=[10000, 100000])
+    parser.add_argument('--chunk', type=int, default=1000, help='CSV_IMPORT_CHUNK_SIZE durante o teste')
+    parser.add_argument('--comparar-orm', action='store_true', help='roda também o caminho ORM linha a linha')
+    args = parser.parse_args()
+
+    tmp = tempfile.mkdtemp(prefix='bench_csv_')
+    os.environ.update({
+        'DATABASE_URL': f"sqlite:///{os.path.join(tmp, 'bench.db')}",
+        'INICIAR_WORKERS': '0',
+        'CSV_IMPORT_CHUNK_SIZE': str(args.chunk),
+        'WORKER_SOCKET_PATH': os.path.join(tmp, 'worker.sock'),
+    })
+
+    import app as assignit
+    logging.getLogger().setLevel(logging.WARNING)
+
+    with assignit.app.app_context():
+        assignit.atualizar_schema()
+
+    caminhos = {'bulk': assignit.importar_csv_campanha}
+    if args.comparar_orm:
+        caminhos['orm'] = lambda stream, cid: importar_orm(assignit, stream, cid)
+
+    print(f"Banco temporário em {tmp} | chunk={args.chunk}")
+    for linhas in args.linhas:
+        arquivo = os.path.join(tmp, f'campanha_{linhas}.csv')
+        gerar_csv(arquivo, linhas)
+        for nome, importar in caminhos.items():
+            with assignit.app.app_context(), open(arquivo, 'rb') as f:
+                inicio = time.perf_counter()
+                inseridas = importar(f, str(uuid.uuid4()))
+                duracao = time.perf_counter() - inicio
+            print(f"{nome:>4} | {linhas:>7} linhas | {inseridas:>7} inseridas | {duracao:7.2f}s | "
+                  f"{inseridas / duracao:9.0f} linhas/s")
+
+
+if __name__ == '__main__':
+    main()
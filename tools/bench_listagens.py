@@ -0,0 +1,94 @@
+# tools/bench_listagens.py
+#
+# Compara o caminho de leitura das listagens: objetos Documento completos + to_dict() (antigo) contra
+# só as colunas de COLUNAS_LISTAGEM em linhas simples + documento_para_dict() (atual).
+#
+#   python tools/bench_listagens.py --documentos 20000 --doc-data-bytes 2000
+#   python tools/bench_listagens.py --linhas 50 10000 --repeticoes 20
+#
+# Para cada tamanho de resposta reporta a latência (mediana) de consulta + serialização JSON e o pico de memória
+# alocada durante uma execução (tracemalloc).
+
+import argparse
+import json
+import logging
+import os
+import statistics
+import sys
+import tempfile
+import time
+import tracemalloc
+import uuid
+from datetime import datetime, timedelta
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+
+def medir(fn, repeticoes):
+    fn()  # aquece caches do SQLite e do SQLAlchemy
+    tempos = []
+    for _ in range(repeticoes):
+        inicio = time.perf_counter()
+        fn()
+        tempos.append(time.perf_counter() - inicio)
+    tracemalloc.start()
+    fn()
+    pico = tracemalloc.get_traced_memory()[1]
+    tracemalloc.stop()
+    return statistics.median(tempos), pico
+
+
+def main():
+    parser = argparse.ArgumentParser(description='Benchmark do caminho de leitura das listagens de documentos.')
+    parser.add_argument('--documentos', type=int, default=20000, help='documentos semeados')
+    parser.add_argument('--doc-data-bytes', type=int, default=2000, help='tamanho aproximado do doc_data de cada um')
+    parser.add_argument('--linhas', type=int, nargs='+', default=[50, 10000], help='linhas por resposta')
+    parser.add_argument('--repeticoes', type=int, default=10)
+    args = parser.parse_args()
+
+    tmp = tempfile.mkdtemp(prefix='bench_listagens_')
+    os.environ.update({
+        'DATABASE_URL': f"sqlite:///{os.path.join(tmp, 'bench.db')}",
+        'INICIAR_WORKERS': '0',
+        'WORKER_SOCKET_PATH': os.path.join(tmp, 'worker.sock'),
+    })
+
+    import app as assignit
+    logging.getLogger().setLevel(logging.WARNING)
+    Documento, db = assignit.Documento, assignit.db
+
+    with assignit.app.app_context():
+        assignit.atualizar_schema()
+        base = datetime(2025, 1, 1)
+        payload = {f"campo_{i}": "x" * 90 for i in range(max(args.doc_data_bytes // 100, 1))}
+        for inicio in range(0, args.documentos, 5000):
+            ids = [str(uuid.uuid4()) for _ in range(inicio, min(inicio + 5000, args.documentos))]
+            db.session.execute(Documento.__table__.insert(), [
+                {"request_id": rid, "status": "pending", "signer_name": f"Participante {i}",
+                 "signer_cpf": f"{i:011d}", "cpf_normalizado": f"{i:011d}", "campanha_id": "bench",
+                 "created_at": base + timedelta(seconds=i), "whatsapp_status": "Pausado"}
+                for i, rid in enumerate(ids, inicio)])
+            db.session.execute(assignit.DocumentoDetalhe.__table__.insert(), [{"request_id": rid, "doc_data": payload} for rid in ids])
+        db.session.commit()
+
+    def orm(n):
+        with assignit.app.app_context():
+            docs = Documento.query.order_by(Documento.created_at.desc()).limit(n).all()
+            return json.dumps([d.to_dict() for d in docs])
+
+    def colunas(n):
+        with assignit.app.app_context():
+            linhas = db.session.execute(db.select(*assignit.COLUNAS_LISTAGEM).order_by(Documento.created_at.desc()).limit(n))
+            return json.dumps([assignit.documento_para_dict(d) for d in linhas])
+
+    print(f"Banco em {tmp} | {args.documentos} documentos | doc_data ~{args.doc_data_bytes} bytes")
+    for n in args.linhas:
+        resultados = {nome: medir(lambda: fn(n), args.repeticoes) for nome, fn in (('orm', orm), ('colunas', colunas))}
+        for nome, (tempo, pico) in resultados.items():
+            print(f"{n:>6} linhas | {nome:>7} | {tempo * 1000:8.1f} ms | pico {pico / 1024:9.0f} KiB")
+        (t_orm, p_orm), (t_col, p_col) = resultados['orm'], resultados['colunas']
+        print(f"{n:>6} linhas | ganho   | {t_orm / t_col:7.1f}x mais rápido | {p_orm / max(p_col, 1):5.1f}x menos memória")
+
+
+if __name__ == '__main__':
+    main()
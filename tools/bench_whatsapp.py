@@ -0,0 +1,134 @@
+# tools/bench_whatsapp.py
+#
+# Mede a vazão da fila de WhatsApp contra o stub local do CRM (nunca contra o webatende real).
+# Cria um banco SQLite temporário, semeia N documentos com notificação 'Pendente' e roda o
+# whatsapp_queue_worker até esvaziar a fila.
+#
+#   python tools/bench_whatsapp.py -n 500 --latencia-ms 80 --taxa-erro 0.1 --limite-rps 30
+#
+# Reporta: tempo total, mensagens/s, latência de envio (p50/p95/p99) e amplificação de retentativas
+# (chamadas ao CRM / mensagens). Com --transacionais K, injeta K avisos de conclusão no meio do
+# disparo em massa e mede quanto cada um esperou na fila (lane transacional).
+
+import argparse
+import logging
+import os
+import sys
+import tempfile
+import threading
+import time
+import uuid
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+from crm_stub import adicionar_argumentos, criar_servidor, opcoes_do_stub  # noqa: E402
+
+
+def percentil(valores, p):
+    if not valores:
+        return 0.0
+    ordenados = sorted(valores)
+    idx = min(len(ordenados) - 1, max(0, int(round(p / 100 * len(ordenados))) - 1))
+    return ordenados[idx]
+
+
+def main():
+    parser = argparse.ArgumentParser(description='Benchmark de vazão da fila de WhatsApp.')
+    parser.add_argument('-n', type=int, default=200, help='quantidade de documentos Pendente')
+    parser.add_argument('--porta', type=int, default=3999)
+    parser.add_argument('--intervalo', type=float, default=0, help='WHATSAPP_INTERVALO_ENVIO durante o teste')
+    parser.add_argument('--backoff-base', type=int, default=1, help='WHATSAPP_BACKOFF_BASE durante o teste')
+    parser.add_argument('--timeout-crm', type=float, default=2, help='CRM_NOTIFY_TIMEOUT durante o teste')
+    parser.add_argument('--limite-s', type=float, default=600, help='desiste depois desse tempo')
+    parser.add_argument('--transacionais', type=int, default=0, help='avisos de conclusão injetados durante o disparo')
+    adicionar_argumentos(parser)
+    args = parser.parse_args()
+
+    tmp = tempfile.mkdtemp(prefix='bench_wa_')
+    os.environ.update({
+        'DATABASE_URL': f"sqlite:///{os.path.join(tmp, 'bench.db')}",
+        'INICIAR_WORKERS': '0',
+        'CRM_NOTIFY_URL': f'http://127.0.0.1:{args.porta}/api/crm/notify/',
+        'CRM_NOTIFY_TIMEOUT': str(args.timeout_crm),
+        'WHATSAPP_INTERVALO_ENVIO': str(args.intervalo),
+        'WHATSAPP_BACKOFF_BASE': str(args.backoff_base),
+        'WHATSAPP_BACKOFF_MAX': str(max(args.backoff_base * 8, 1)),
+        'CRM_CIRCUITO_ESTADO_PATH': os.path.join(tmp, 'circuito.json'),
+        'WORKER_SOCKET_PATH': os.path.join(tmp, 'worker.sock'),
+    })
+
+    import requests
+    import app as assignit
+    logging.getLogger().setLevel(logging.WARNING)
+
+    servidor = criar_servidor(args.porta, **opcoes_do_stub(args))
+    threading.Thread(target=servidor.serve_forever, daemon=True).start()
+
+    # Instrumenta o cliente HTTP para medir a latência de cada chamada ao CRM
+    latencias = []
+    post_original = requests.post
+    def post_medido(*a, **k):
+        inicio = time.perf_counter()
+        try:
+            return post_original(*a, **k)
+        finally:
+            latencias.append(time.perf_counter() - inicio)
+    requests.post = post_medido
+
+    with assignit.app.app_context():
+        assignit.atualizar_schema()
+        ids = [str(uuid.uuid4()) for _ in range(args.n)]
+        assignit.db.session.execute(assignit.Documento.__table__.insert(), [
+            {"request_id": rid, "status": "pending", "signer_name": f"Bench {i}", "signer_cpf": f"{i:011d}",
+             "signer_phone": "5511999999999", "original_filename": f"bench_{rid}.pdf",
+             "campanha_id": "bench", "whatsapp_status": "Pendente"}
+            for i, rid in enumerate(ids)])
+        assignit.db.session.execute(assignit.Notificacao.__table__.insert(), [
+            {"request_id": rid, "kind": "campanha"} for rid in ids])
+        assignit.db.session.commit()
+
+    print(f"Semeados {args.n} documentos em {tmp}. Drenando...")
+    inicio = time.perf_counter()
+    threading.Thread(target=assignit.whatsapp_queue_worker, daemon=True).start()
+
+    transacionais = []
+    restantes = args.n
+    while time.perf_counter() - inicio < args.limite_s:
+        time.sleep(0.2)
+        if args.transacionais and not transacionais and time.perf_counter() - inicio > 1:
+            with assignit.app.app_context():
+                for rid in ids[-args.transacionais:]:
+                    notif = assignit.Notificacao(request_id=rid, kind='conclusao')
+                    assignit.db.session.add(notif)
+                    transacionais.append(notif)
+                assignit.db.session.commit()
+                transacionais = [n.id for n in transacionais]
+            assignit.ESPERAS_FILAS['whatsapp'].acordar()
+        with assignit.app.app_context():
+            restantes = assignit.Notificacao.query.filter_by(status='Pendente').count()
+        if not restantes:
+            break
+    duracao = time.perf_counter() - inicio
+
+    with assignit.app.app_context():
+        por_status = dict(assignit.db.session.query(assignit.Notificacao.status, assignit.db.func.count())
+                          .group_by(assignit.Notificacao.status).all())
+    enviados = por_status.get('Enviado', 0)
+
+    print(f"Duração: {duracao:.2f}s {'(limite atingido, ' + str(restantes) + ' restantes)' if restantes else ''}")
+    print(f"Status finais: {por_status}")
+    print(f"Vazão: {enviados / duracao:.1f} msg/s")
+    print(f"Latência de envio: p50={percentil(latencias, 50) * 1000:.0f}ms "
+          f"p95={percentil(latencias, 95) * 1000:.0f}ms p99={percentil(latencias, 99) * 1000:.0f}ms")
+    print(f"Chamadas ao CRM: {len(latencias)} | amplificação de retentativas: {len(latencias) / max(args.n + len(transacionais), 1):.2f}x")
+    if transacionais:
+        with assignit.app.app_context():
+            esperas = [(n.sent_at - n.created_at).total_seconds() for n in
+                       assignit.Notificacao.query.filter(assignit.Notificacao.id.in_(transacionais)).all() if n.sent_at]
+        print(f"Transacionais no meio do disparo: {len(esperas)}/{len(transacionais)} enviadas | "
+              f"espera máx {max(esperas, default=0) * 1000:.0f}ms | média {sum(esperas) / max(len(esperas), 1) * 1000:.0f}ms")
+    print(f"Circuito: {assignit.circuito_crm.snapshot()['estado']} | Stub: {servidor.cfg.stats}")
+    servidor.shutdown()
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,144 @@
+# tools/crm_stub.py
+#
+# Servidor local que imita o /api/crm/notify/ do webatende para testes de carga da fila de WhatsApp.
+#
+#   python tools/crm_stub.py --porta 3999 --latencia-ms 150 --jitter-ms 50 --taxa-erro 0.05 --limite-rps 20
+#   CRM_NOTIFY_URL=http://127.0.0.1:3999/api/crm/notify/ python3 app.py
+#
+# GET /stats devolve os contadores (recebidas, ok, erro, rate_limit, travadas, repetidas).
+# "repetidas" conta respostas 200 para um número que já tinha recebido mensagem (envio duplicado).
+
+import argparse
+import json
+import random
+import threading
+import time
+import urllib.parse
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+
+class ConfigStub:
+    def __init__(self, latencia_ms=100, jitter_ms=0, taxa_erro=0.0, taxa_trava=0.0, trava_s=30, limite_rps=0):
+        self.latencia_ms = latencia_ms
+        self.jitter_ms = jitter_ms
+        self.taxa_erro = taxa_erro
+        self.taxa_trava = taxa_trava
+        self.trava_s = trava_s
+        self.limite_rps = limite_rps
+        self.lock = threading.Lock()
+        self.stats = {"recebidas": 0, "ok": 0, "erro": 0, "rate_limit": 0, "travadas": 0, "repetidas": 0}
+        self.entregues = set()
+        self.janela_inicio = time.time()
+        self.janela_count = 0
+
+    def contar(self, chave):
+        with self.lock:
+            self.stats[chave] += 1
+
+    def entregar(self, numero):
+        with self.lock:
+            self.stats["ok"] += 1
+            if numero in self.entregues:
+                self.stats["repetidas"] += 1
+            self.entregues.add(numero)
+
+    def estourou_limite(self):
+        """Janela fixa de 1s: acima de limite_rps chamadas o stub responde 429."""
+        if not self.limite_rps:
+            return False
+        with self.lock:
+            agora = time.time()
+            if agora - self.janela_inicio >= 1:
+                self.janela_inicio, self.janela_count = agora, 0
+            self.janela_count += 1
+            return self.janela_count > self.limite_rps
+
+
+def criar_handler(cfg):
+    class CrmStubHandler(BaseHTTPRequestHandler):
+        def log_message(self, *args):
+            pass
+
+        def responder(self, codigo, corpo):
+            dados = json.dumps(corpo).encode()
+            try:
+                self.send_response(codigo)
+                self.send_header('Content-Type', 'application/json')
+                self.send_header('Content-Length', str(len(dados)))
+                self.end_headers()
+                self.wfile.write(dados)
+            except (BrokenPipeError, ConnectionResetError):
+                # O cliente já desistiu (timeout): é exatamente o cenário que estamos simulando
+                pass
+
+        def do_GET(self):
+            if self.path.startswith('/stats'):
+                with cfg.lock:
+                    return self.responder(200, dict(cfg.stats))
+            self.responder(404, {"erro": "rota inexistente"})
+
+        def do_POST(self):
+            if not self.path.startswith('/api/crm/notify'):
+                return self.responder(404, {"erro": "rota inexistente"})
+            tamanho = int(self.headers.get('Content-Length') or 0)
+            if tamanho:
+                self.rfile.read(tamanho)
+            cfg.contar('recebidas')
+
+            if cfg.estourou_limite():
+                cfg.contar('rate_limit')
+                return self.responder(429, {"erro": "rate limit"})
+            if random.random() < cfg.taxa_trava:
+                # Simula o CRM pendurado: o cliente deve estourar o timeout
+                cfg.contar('travadas')
+                time.sleep(cfg.trava_s)
+                return self.responder(504, {"erro": "gateway timeout"})
+
+            atraso = max(0, cfg.latencia_ms + random.uniform(-cfg.jitter_ms, cfg.jitter_ms))
+            time.sleep(atraso / 1000)
+            if random.random() < cfg.taxa_erro:
+                cfg.contar('erro')
+                return self.responder(500, {"erro": "falha simulada"})
+            cfg.entregar(urllib.parse.parse_qs(urllib.parse.urlparse(self.path).query).get('numero', [''])[0])
+            self.responder(200, {"status": "ok"})
+
+    return CrmStubHandler
+
+
+def criar_servidor(porta=3999, **opcoes):
+    """Cria o servidor (sem iniciar). Usado pelo harness para subir o stub em uma thread."""
+    cfg = ConfigStub(**opcoes)
+    servidor = ThreadingHTTPServer(('127.0.0.1', porta), criar_handler(cfg))
+    servidor.daemon_threads = True
+    servidor.cfg = cfg
+    return servidor
+
+
+def adicionar_argumentos(parser):
+    parser.add_argument('--latencia-ms', type=float, default=100, help='latência média de cada resposta')
+    parser.add_argument('--jitter-ms', type=float, default=0, help='variação (+/-) da latência')
+    parser.add_argument('--taxa-erro', type=float, default=0.0, help='fração de respostas HTTP 500 (0 a 1)')
+    parser.add_argument('--taxa-trava', type=float, default=0.0, help='fração de chamadas que ficam penduradas')
+    parser.add_argument('--trava-s', type=float, default=30, help='quanto tempo uma chamada pendurada segura a conexão')
+    parser.add_argument('--limite-rps', type=int, default=0, help='acima disso por segundo responde 429 (0 = sem limite)')
+
+
+def opcoes_do_stub(args):
+    return {
+        "latencia_ms": args.latencia_ms, "jitter_ms": args.jitter_ms, "taxa_erro": args.taxa_erro,
+        "taxa_trava": args.taxa_trava, "trava_s": args.trava_s, "limite_rps": args.limite_rps
+    }
+
+
+if __name__ == '__main__':
+    parser = argparse.ArgumentParser(description='Stub local do endpoint de notificação do CRM.')
+    parser.add_argument('--porta', type=int, default=3999)
+    adicionar_argumentos(parser)
+    args = parser.parse_args()
+
+    servidor = criar_servidor(args.porta, **opcoes_do_stub(args))
+    print(f"CRM stub ouvindo em http://127.0.0.1:{args.porta}/api/crm/notify/")
+    try:
+        servidor.serve_forever()
+    except KeyboardInterrupt:
+        pass
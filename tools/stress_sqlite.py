@@ -0,0 +1,143 @@
+# tools/stress_sqlite.py
+#
+# Teste de estresse de leitura/escrita concorrente no SQLite, no formato da produção: vários processos
+# (como os workers do Gunicorn) escrevendo lotes de importação e atualizando status como o worker de PDF,
+# enquanto outros processos fazem as consultas do painel admin.
+#
+#   python tools/stress_sqlite.py --escritores 4 --leitores 4 --duracao 20
+#   python tools/stress_sqlite.py --sem-pragmas     # modo antigo (rollback journal, sem busy_timeout)
+#
+# Reporta operações por segundo, latência das leituras e quantos "database is locked" cada papel recebeu.
+
+import argparse
+import logging
+import multiprocessing
+import os
+import sys
+import tempfile
+import time
+import uuid
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+PRAGMAS_ENV = ['SQLITE_JOURNAL_MODE', 'SQLITE_BUSY_TIMEOUT_MS', 'SQLITE_SYNCHRONOUS', 'SQLITE_MMAP_SIZE', 'SQLITE_CACHE_SIZE',
+               'SQLITE_JOURNAL_SIZE_LIMIT']
+
+
+def percentil(valores, p):
+    if not valores:
+        return 0.0
+    ordenados = sorted(valores)
+    return ordenados[min(len(ordenados) - 1, max(0, int(round(p / 100 * len(ordenados))) - 1))]
+
+
+def carregar_app(largada=None):
+    """Importa o app (lento: cv2/fitz) e, se houver largada, espera todos os processos ficarem prontos."""
+    import app as assignit
+    logging.getLogger().setLevel(logging.CRITICAL)
+    if largada:
+        prontos, inicio, duracao = largada
+        prontos.release()
+        inicio.wait()
+        return assignit, time.time() + duracao
+    return assignit
+
+
+def escritor(n, largada, lote, fila):
+    assignit, fim = carregar_app(largada)
+    from sqlalchemy.exc import OperationalError
+    res = {"papel": "escritor", "ok": 0, "travado": 0, "outros": 0, "latencias": []}
+    stmt = assignit.Documento.__table__.insert()
+    while time.time() < fim:
+        inicio = time.perf_counter()
+        try:
+            with assignit.app.app_context():
+                # Um lote de importação...
+                assignit.db.session.execute(stmt, [
+                    {"request_id": str(uuid.uuid4()), "campanha_id": f"stress{n}", "signer_cpf": uuid.uuid4().hex[:11],
+                     "status": "generating", "created_at": assignit.datetime.now(assignit.UTC)} for _ in range(lote)])
+                assignit.db.session.commit()
+                # ...e o worker de PDF marcando documentos um a um
+                for doc in assignit.Documento.query.filter_by(campanha_id=f"stress{n}", status='generating').limit(10).all():
+                    doc.status = 'pending'
+                    assignit.db.session.commit()
+            res["ok"] += 1
+        except OperationalError as e:
+            res["travado" if 'locked' in str(e) else "outros"] += 1
+        res["latencias"].append(time.perf_counter() - inicio)
+    fila.put(res)
+
+
+def leitor(n, largada, fila):
+    assignit, fim = carregar_app(largada)
+    from sqlalchemy.exc import OperationalError
+    Documento, db = assignit.Documento, assignit.db
+    res = {"papel": "leitor", "ok": 0, "travado": 0, "outros": 0, "latencias": []}
+    while time.time() < fim:
+        inicio = time.perf_counter()
+        try:
+            with assignit.app.app_context():
+                # Mesmas consultas da listagem do admin e das contagens das campanhas
+                Documento.query.order_by(Documento.created_at.desc()).paginate(page=1, per_page=50, error_out=False)
+                db.session.query(Documento.campanha_id, Documento.status, db.func.count()).group_by(Documento.campanha_id, Documento.status).all()
+            res["ok"] += 1
+        except OperationalError as e:
+            res["travado" if 'locked' in str(e) else "outros"] += 1
+        res["latencias"].append(time.perf_counter() - inicio)
+    fila.put(res)
+
+
+def main():
+    parser = argparse.ArgumentParser(description='Estresse de leitura/escrita concorrente no SQLite.')
+    parser.add_argument('--escritores', type=int, default=4)
+    parser.add_argument('--leitores', type=int, default=4)
+    parser.add_argument('--duracao', type=float, default=15, help='segundos de carga')
+    parser.add_argument('--lote', type=int, default=200, help='linhas por lote de importação')
+    parser.add_argument('--sem-pragmas', action='store_true', help='desliga os PRAGMAs (comportamento anterior)')
+    args = parser.parse_args()
+
+    tmp = tempfile.mkdtemp(prefix='stress_sqlite_')
+    os.environ.update({
+        'DATABASE_URL': f"sqlite:///{os.path.join(tmp, 'stress.db')}",
+        'INICIAR_WORKERS': '0',
+        'WORKER_SOCKET_PATH': os.path.join(tmp, 'worker.sock'),
+    })
+    if args.sem_pragmas:
+        os.environ.update({k: '' for k in PRAGMAS_ENV})
+
+    # Schema criado em um processo à parte para os filhos abrirem suas próprias conexões
+    ctx = multiprocessing.get_context('spawn')
+    p = ctx.Process(target=criar_schema)
+    p.start()
+    p.join()
+
+    fila = ctx.Queue()
+    largada = (ctx.Semaphore(0), ctx.Event(), args.duracao)
+    processos = [ctx.Process(target=escritor, args=(i, largada, args.lote, fila)) for i in range(args.escritores)]
+    processos += [ctx.Process(target=leitor, args=(i, largada, fila)) for i in range(args.leitores)]
+    for p in processos:
+        p.start()
+    for _ in processos:
+        largada[0].acquire()
+    largada[1].set()
+    resultados = [fila.get() for _ in processos]
+    for p in processos:
+        p.join()
+
+    print(f"Banco em {tmp} | {'SEM pragmas' if args.sem_pragmas else 'com pragmas'} | {args.duracao:.0f}s")
+    for papel in ('escritor', 'leitor'):
+        rs = [r for r in resultados if r["papel"] == papel]
+        lat = [x for r in rs for x in r["latencias"]]
+        ok, travado, outros = (sum(r[k] for r in rs) for k in ("ok", "travado", "outros"))
+        print(f"{papel + 'es':>11}: {ok:6d} ok ({ok / args.duracao:7.1f}/s) | database is locked: {travado} | outros erros: {outros} | "
+              f"p50={percentil(lat, 50) * 1000:.0f}ms p95={percentil(lat, 95) * 1000:.0f}ms p99={percentil(lat, 99) * 1000:.0f}ms")
+
+
+def criar_schema():
+    assignit = carregar_app()
+    with assignit.app.app_context():
+        assignit.atualizar_schema()
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,143 @@
+# tools/verificar_skip_locked.py
+#
+# Confere que várias "máquinas" consomem as filas de PDF e de WhatsApp ao mesmo tempo sem pegar o mesmo
+# item duas vezes (claim com SELECT ... FOR UPDATE SKIP LOCKED). Cada processo filho faz o papel do líder
+# de uma máquina: roda background_campaign_processor e whatsapp_queue_worker contra o mesmo banco.
+#
+# Precisa de um Postgres VAZIO (o teste se recusa a rodar se já houver documentos: os workers consumiriam
+# as filas reais). O CRM é o stub local e a geração de PDF é substituída por um registro do claim.
+#
+#   createdb assignit_teste
+#   DATABASE_URL=postgresql://postgres@localhost/assignit_teste python tools/verificar_skip_locked.py --processos 4 -n 500
+#
+# Sai com código 1 se algum documento foi gerado ou alguma mensagem enviada mais de uma vez.
+
+import argparse
+import logging
+import multiprocessing
+import os
+import sys
+import tempfile
+import threading
+import time
+import uuid
+from collections import Counter
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+from crm_stub import criar_servidor  # noqa: E402
+
+
+def maquina(fila, pasta):
+    """Processo filho: sobe as duas filas como o líder de uma máquina faria e registra cada claim."""
+    import requests
+    import app as assignit
+    logging.getLogger().setLevel(logging.CRITICAL)
+    assignit.app.config['PENDING_FOLDER'] = pasta
+
+    def gerar_pdf_falso(tpl, dados, caminho):
+        fila.put(('pdf', os.getpid(), os.path.basename(os.path.dirname(caminho))))
+        time.sleep(0.01)
+        return 'hash'
+    assignit.gerar_pdf_para_campanha = gerar_pdf_falso
+
+    post_original = requests.post
+    def post_registrado(url, params=None, **k):
+        fila.put(('wa', os.getpid(), params['numero']))
+        return post_original(url, params=params, **k)
+    requests.post = post_registrado
+
+    threading.Thread(target=assignit.whatsapp_queue_worker, daemon=True).start()
+    threading.Thread(target=assignit.background_campaign_processor, args=(assignit.app.app_context(),), daemon=True).start()
+    while True:
+        time.sleep(1)
+
+
+def main():
+    parser = argparse.ArgumentParser(description='Verifica claims concorrentes (SKIP LOCKED) nas filas de PDF e WhatsApp.')
+    parser.add_argument('-n', type=int, default=300, help='documentos (e mensagens) semeados')
+    parser.add_argument('--processos', type=int, default=4, help='máquinas simuladas')
+    parser.add_argument('--porta', type=int, default=3998)
+    parser.add_argument('--limite-s', type=float, default=300)
+    args = parser.parse_args()
+
+    if not os.environ.get('DATABASE_URL', '').startswith(('postgres://', 'postgresql')):
+        sys.exit('Defina DATABASE_URL apontando para um Postgres vazio.')
+    tmp = tempfile.mkdtemp(prefix='skip_locked_')
+    os.environ.update({
+        'INICIAR_WORKERS': '0',
+        'CRM_NOTIFY_URL': f'http://127.0.0.1:{args.porta}/api/crm/notify/',
+        'WHATSAPP_INTERVALO_ENVIO': '0',
+        'CRM_CIRCUITO_ESTADO_PATH': os.path.join(tmp, 'circuito.json'),
+        'WORKER_SOCKET_PATH': os.path.join(tmp, 'worker.sock'),
+    })
+
+    import app as assignit
+    logging.getLogger().setLevel(logging.WARNING)
+    with assignit.app.app_context():
+        assignit.atualizar_schema()
+        if assignit.Documento.query.count():
+            sys.exit('O banco já tem documentos; use um banco vazio só para este teste.')
+        tpl_id, camp_id = str(uuid.uuid4()), str(uuid.uuid4())
+        assignit.db.session.add(assignit.TemplateDocumento(id=tpl_id, name='verificacao', original_filename='x.pdf', fields_mapping=[]))
+        assignit.db.session.add(assignit.Campanha(id=camp_id, name='verificacao', template_id=tpl_id))
+        ids = [str(uuid.uuid4()) for _ in range(args.n)]
+        assignit.db.session.execute(assignit.Documento.__table__.insert(), [
+            {"request_id": rid, "status": "generating", "signer_name": f"Teste {i}", "signer_cpf": f"{i:011d}",
+             "cpf_normalizado": f"{i:011d}", "signer_phone": f"5511{i:09d}", "original_filename": f"{rid}.pdf",
+             "campanha_id": camp_id, "whatsapp_status": "Pendente"} for i, rid in enumerate(ids)])
+        assignit.db.session.execute(assignit.Notificacao.__table__.insert(), [
+            {"request_id": rid, "kind": "campanha", "lane": 2} for rid in ids])
+        assignit.db.session.commit()
+        assignit.db.engine.dispose()
+
+    servidor = criar_servidor(args.porta, latencia_ms=20)
+    threading.Thread(target=servidor.serve_forever, daemon=True).start()
+
+    ctx = multiprocessing.get_context('spawn')
+    fila = ctx.Queue()
+    filhos = [ctx.Process(target=maquina, args=(fila, tmp), daemon=True) for _ in range(args.processos)]
+    for p in filhos:
+        p.start()
+    print(f"{args.processos} máquinas simuladas consumindo {args.n} documentos e {args.n} mensagens...")
+
+    inicio = time.perf_counter()
+    eventos = []
+    while time.perf_counter() - inicio < args.limite_s:
+        time.sleep(0.5)
+        while not fila.empty():
+            eventos.append(fila.get())
+        with assignit.app.app_context():
+            faltam_pdf = assignit.Documento.query.filter(assignit.Documento.status.in_(['generating', 'processing'])).count()
+            faltam_wa = assignit.Notificacao.query.filter_by(status='Pendente').count()
+        if not faltam_pdf and not faltam_wa:
+            break
+    time.sleep(1)
+    while not fila.empty():
+        eventos.append(fila.get())
+    for p in filhos:
+        p.terminate()
+    duracao = time.perf_counter() - inicio
+
+    falhou = False
+    for tipo, nome in (('pdf', 'PDFs gerados'), ('wa', 'Mensagens enviadas')):
+        itens = Counter(item for t, _, item in eventos if t == tipo)
+        por_processo = Counter(pid for t, pid, _ in eventos if t == tipo)
+        repetidos = sum(1 for c in itens.values() if c > 1)
+        falhou |= bool(repetidos) or len(itens) != args.n
+        print(f"{nome}: {len(itens)}/{args.n} distintos | repetidos: {repetidos} | por processo: {sorted(por_processo.values())}")
+    print(f"Stub do CRM: {servidor.cfg.stats} | {duracao:.1f}s")
+    falhou |= servidor.cfg.stats['repetidas'] > 0
+
+    with assignit.app.app_context():
+        assignit.Notificacao.query.filter(assignit.Notificacao.request_id.in_(ids)).delete(synchronize_session=False)
+        assignit.Documento.query.filter_by(campanha_id=camp_id).delete(synchronize_session=False)
+        assignit.Campanha.query.filter_by(id=camp_id).delete()
+        assignit.TemplateDocumento.query.filter_by(id=tpl_id).delete()
+        assignit.db.session.commit()
+    servidor.shutdown()
+    print("FALHA: houve claim duplicado ou item não processado" if falhou else "OK: cada item foi processado exatamente uma vez")
+    sys.exit(1 if falhou else 0)
+
+
+if __name__ == '__main__':
+    main()